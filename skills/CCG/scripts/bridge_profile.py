@@ -0,0 +1,185 @@
+#!/usr/bin/env python3
+"""
+Profiling support for CCG bridges (--profile).
+
+Records bridge phases (config load, env prep, build_command, spawn, per-event
+parse/dispatch, final serialization and output) as Chrome trace events, viewable
+in chrome://tracing or https://ui.perfetto.dev. The child process lifetime is
+drawn on its own track, so gaps between parse/dispatch slices are time spent
+waiting on the agent.
+
+Optionally also dumps cProfile stats (--profile-python) and the top tracemalloc
+allocations (--profile-memory) for the bridge process; either flag implies
+--profile and writes the trace as well.
+"""
+
+import cProfile
+import json
+import os
+import sys
+import time
+import tracemalloc
+from contextlib import contextmanager, nullcontext
+from pathlib import Path
+
+PROFILES_DIR = Path.home() / ".ccg" / "profiles"
+TOP_ALLOCATIONS = 25
+
+BRIDGE_TID = 1
+CHILD_TID = 2
+
+
+class BridgeProfiler:
+    """Collects trace events for one bridge run. A no-op unless enabled."""
+
+    def __init__(
+        self,
+        agent: str,
+        enabled: bool = False,
+        trace_path: str | None = None,
+        cprofile: bool = False,
+        memory: bool = False,
+    ):
+        self.agent = agent
+        self.enabled = enabled or cprofile or memory
+        self.cprofile = cprofile
+        self.memory = memory
+        self.events = []
+        self.pid = os.getpid()
+        self._origin = time.perf_counter()
+        self._cprofile = None
+        self._null = nullcontext()
+        if trace_path:
+            self.trace_path = Path(trace_path).expanduser()
+        else:
+            self.trace_path = PROFILES_DIR / f"{agent}-{time.strftime('%Y%m%d-%H%M%S')}.trace.json"
+
+    def now(self) -> float:
+        """Microseconds since the profiler was created (0 when disabled)."""
+        if not self.enabled:
+            return 0
+        return (time.perf_counter() - self._origin) * 1e6
+
+    def complete(self, name: str, start: float, tid: int = BRIDGE_TID, **args):
+        """Record a complete ('X') event from `start` (see now()) until now."""
+        if not self.enabled:
+            return
+        event = {
+            "name": name,
+            "ph": "X",
+            "ts": start,
+            "dur": self.now() - start,
+            "pid": self.pid,
+            "tid": tid,
+        }
+        if args:
+            event["args"] = args
+        self.events.append(event)
+
+    def phase(self, name: str, tid: int = BRIDGE_TID, **args):
+        """Context manager recording the enclosed block as one trace slice."""
+        if not self.enabled:
+            return self._null
+        return self._phase(name, tid, args)
+
+    @contextmanager
+    def _phase(self, name: str, tid: int, args: dict):
+        start = self.now()
+        try:
+            yield
+        finally:
+            self.complete(name, start, tid, **args)
+
+    def prepare(self) -> str | None:
+        """Check the trace path is writable before the run; return an error or None."""
+        if not self.enabled:
+            return None
+        try:
+            self.trace_path.parent.mkdir(parents=True, exist_ok=True)
+            open(self.trace_path, "a").close()
+        except OSError as e:
+            return str(e)
+        return None
+
+    def __enter__(self):
+        if not self.enabled:
+            return self
+        if self.memory:
+            tracemalloc.start()
+        if self.cprofile:
+            self._cprofile = cProfile.Profile()
+            self._cprofile.enable()
+        self._run_start = self.now()
+        return self
+
+    def __exit__(self, *exc):
+        if not self.enabled:
+            return False
+        self.complete("bridge", self._run_start)
+        if self._cprofile:
+            self._cprofile.disable()
+        self.save()
+        return False
+
+    def _metadata(self) -> list[dict]:
+        def name_event(name, tid=None, value=None):
+            event = {"name": name, "ph": "M", "pid": self.pid, "args": {"name": value}}
+            if tid is not None:
+                event["tid"] = tid
+            return event
+
+        return [
+            name_event("process_name", value=f"{self.agent}_bridge"),
+            name_event("thread_name", BRIDGE_TID, "bridge"),
+            name_event("thread_name", CHILD_TID, f"{self.agent} (child)"),
+        ]
+
+    def save(self):
+        """Write the trace and any optional output; warn instead of failing the run."""
+        try:
+            self._save()
+        except OSError as e:
+            print(f"[{self.agent}_bridge] Profile not written: {e}", file=sys.stderr)
+
+    def _save(self):
+        self.trace_path.parent.mkdir(parents=True, exist_ok=True)
+        base = str(self.trace_path)
+        for suffix in (".trace.json", ".json"):
+            if base.endswith(suffix):
+                base = base[: -len(suffix)]
+                break
+
+        other = {"agent": self.agent, "argv": sys.argv[1:]}
+        written = [str(self.trace_path)]
+
+        if self._cprofile:
+            prof_path = base + ".prof"
+            self._cprofile.dump_stats(prof_path)
+            written.append(prof_path)
+
+        if self.memory and tracemalloc.is_tracing():
+            current, peak = tracemalloc.get_traced_memory()
+            snapshot = tracemalloc.take_snapshot().filter_traces([
+                tracemalloc.Filter(False, tracemalloc.__file__),
+                tracemalloc.Filter(False, cProfile.__file__),
+            ])
+            tracemalloc.stop()
+            other["traced_memory_current"] = current
+            other["traced_memory_peak"] = peak
+            alloc_path = base + ".alloc.txt"
+            with open(alloc_path, "w") as f:
+                f.write(f"current={current} peak={peak} bytes\n")
+                for stat in snapshot.statistics("lineno")[:TOP_ALLOCATIONS]:
+                    f.write(f"{stat}\n")
+            written.append(alloc_path)
+
+        trace = {
+            "traceEvents": self._metadata() + self.events,
+            "displayTimeUnit": "ms",
+            "otherData": other,
+        }
+        with open(self.trace_path, "w") as f:
+            json.dump(trace, f)
+
+        for path in written:
+            print(f"[{self.agent}_bridge] Profile written: {path}", file=sys.stderr)
@@ -115,7 +115,10 @@ def install_scripts(source_dir: Path = None):
 
     SCRIPTS_DIR.mkdir(parents=True, exist_ok=True)
 
-    scripts = ["configure.py", "codex_bridge.py", "gemini_bridge.py", "setup_check.sh"]
+    scripts = [
+        "configure.py", "codex_bridge.py", "gemini_bridge.py",
+        "run_journal.py", "bridge_profile.py", "repo_map.py", "setup_check.sh",
+    ]
     copied = []
     for script in scripts:
         src = source_dir / script
@@ -9,6 +9,10 @@ Usage:
     python3 gemini_bridge.py --prompt "Refactor the utils module" --workdir /path/to/project
     python3 gemini_bridge.py --prompt "Add error handling" --sandbox --yolo
     python3 gemini_bridge.py --prompt "Continue" --resume latest
+    python3 gemini_bridge.py --recover <RUN_ID>
+    python3 gemini_bridge.py --recover <RUN_ID> --prompt "Finish the task"
+    python3 gemini_bridge.py --prompt "Fix the bug" --profile trace.json
+    python3 gemini_bridge.py --prompt "Fix the bug" --workdir /path/to/project --context-map
 """
 
 import argparse
@@ -18,6 +22,10 @@ import subprocess
 import sys
 from pathlib import Path
 
+from bridge_profile import CHILD_TID, BridgeProfiler
+from repo_map import build_repo_map, with_context_map
+from run_journal import RunJournal, load_journal
+
 CONFIG_FILE = Path.home() / ".ccg" / "config.json"
 
 
@@ -29,7 +37,7 @@ def load_ccg_config() -> dict | None:
     return None
 
 
-def build_command(args: argparse.Namespace) -> list[str]:
+def build_command(args: argparse.Namespace, prompt: str | None = None) -> list[str]:
     """Build the gemini command from parsed arguments."""
     cmd = ["gemini"]
 
@@ -46,36 +54,107 @@ def build_command(args: argparse.Namespace) -> list[str]:
         cmd.extend(["--resume", args.resume])
 
     cmd.extend(["-o", "stream-json"])
-    cmd.append(args.prompt)
+    cmd.append(prompt if prompt is not None else args.prompt)
 
     return cmd
 
 
-def run(args: argparse.Namespace) -> int:
+def run(args: argparse.Namespace, profiler: BridgeProfiler | None = None) -> int:
     """Execute gemini and stream-parse JSON output."""
-    # Load CCG config and prepare environment
-    config = load_ccg_config()
-    env = os.environ.copy()
+    profiler = profiler or BridgeProfiler("gemini")
+
+    # Rebuild an earlier run from its journal; continue it only if a prompt was given
+    prior = None
+    if args.recover:
+        try:
+            prior = load_journal(args.recover, "gemini")
+        except (FileNotFoundError, ValueError) as e:
+            print(json.dumps({"error": str(e), "exit_code": 1}), file=sys.stderr)
+            return 1
+        if not args.prompt:
+            print(json.dumps(prior, ensure_ascii=False, indent=2))
+            # Non-zero for unfinished runs so callers can tell they need continuing
+            return prior["exit_code"] if prior["finished"] else 1
+        if not prior["session_id"]:
+            print(json.dumps({
+                "error": f"Run {args.recover} has no captured session_id; cannot continue",
+                "exit_code": 1,
+            }), file=sys.stderr)
+            return 1
+        args.resume = prior["session_id"]
+        # Continue in the original directory with the original model unless overridden
+        if not args.workdir:
+            args.workdir = prior["start"].get("workdir")
+        if not args.model:
+            args.model = prior["start"].get("model")
 
-    if config and "gemini" in config:
-        gemini_cfg = config["gemini"]
-        if gemini_cfg.get("api_key"):
-            env["GEMINI_API_KEY"] = gemini_cfg["api_key"]
-        if gemini_cfg.get("base_url"):
-            env["GOOGLE_GEMINI_BASE_URL"] = gemini_cfg["base_url"]
-        # Use config model as default if not specified on command line
-        if not args.model and gemini_cfg.get("model"):
-            args.model = gemini_cfg["model"]
-
-    cmd = build_command(args)
+    # Load CCG config and prepare environment
+    with profiler.phase("config_load"):
+        config = load_ccg_config()
+    with profiler.phase("env_prep"):
+        env = os.environ.copy()
+
+        if config and "gemini" in config:
+            gemini_cfg = config["gemini"]
+            if gemini_cfg.get("api_key"):
+                env["GEMINI_API_KEY"] = gemini_cfg["api_key"]
+            if gemini_cfg.get("base_url"):
+                env["GOOGLE_GEMINI_BASE_URL"] = gemini_cfg["base_url"]
+            # Use config model as default if not specified on command line
+            if not args.model and gemini_cfg.get("model"):
+                args.model = gemini_cfg["model"]
+
+    # Prepend a cached repository map so the agent starts on-target. The map is
+    # an optimization: on any failure fall back to the plain prompt. A resumed
+    # session already received the map in its first turn.
+    prompt = args.prompt
+    if args.context_map and args.resume:
+        if args.verbose:
+            print("[gemini_bridge] Context map skipped: resuming an existing session", file=sys.stderr)
+    elif args.context_map:
+        try:
+            with profiler.phase("context_map"):
+                repo_map, map_stats = build_repo_map(args.workdir)
+            prompt = with_context_map(args.prompt, repo_map)
+            if args.verbose:
+                print(f"[gemini_bridge] Context map: {json.dumps(map_stats)}", file=sys.stderr)
+        except Exception as e:
+            print(f"[gemini_bridge] Context map skipped: {e}", file=sys.stderr)
+
+    with profiler.phase("build_command"):
+        cmd = build_command(args, prompt)
 
     if args.verbose:
         print(f"[gemini_bridge] Running: {' '.join(cmd)}", file=sys.stderr)
 
     session_id = None
     messages = []
+    journal = None
+    if not args.no_journal:
+        # The journal is best-effort: an unwritable ~/.ccg must not block the run
+        try:
+            with profiler.phase("journal_start"):
+                journal = RunJournal("gemini")
+                journal.start(args)
+            print(f"[gemini_bridge] Run journal: {journal.run_id}", file=sys.stderr)
+        except OSError as e:
+            print(f"[gemini_bridge] Run journal disabled: {e}", file=sys.stderr)
+            journal = None
+
+    def add_message(msg: dict):
+        messages.append(msg)
+        if journal:
+            journal.record_message(msg)
+
+    if prior:
+        session_id = prior["session_id"]
+        if journal:
+            journal.record_session(session_id)
+        for msg in prior["messages"]:
+            add_message(msg)
 
     try:
+        spawn_start = profiler.now()
         proc = subprocess.Popen(
             cmd,
             stdout=subprocess.PIPE,
@@ -84,18 +163,22 @@ def run(args: argparse.Namespace) -> int:
             cwd=args.workdir,
             env=env,
         )
+        profiler.complete("spawn", spawn_start)
+        child_start = profiler.now()
 
         for line in proc.stdout:
             line = line.strip()
             if not line:
                 continue
             try:
-                event = json.loads(line)
+                with profiler.phase("parse", chars=len(line)):
+                    event = json.loads(line)
             except json.JSONDecodeError:
                 if args.verbose:
                     print(f"[gemini_bridge] Non-JSON line: {line}", file=sys.stderr)
                 continue
 
+            dispatch_start = profiler.now()
             etype = event.get("type", "")
 
             # Capture session ID
@@ -103,10 +186,12 @@ def run(args: argparse.Namespace) -> int:
                 session_id = event["sessionId"]
             elif "session_id" in event:
                 session_id = event["session_id"]
+            if journal:
+                journal.record_session(session_id)
 
             # Capture agent messages
             if etype in ("modelTurn", "agent_message", "message"):
-                messages.append(event)
+                add_message(event)
                 # Extract text content
                 parts = event.get("parts", [])
                 for part in parts:
@@ -122,8 +207,12 @@ def run(args: argparse.Namespace) -> int:
                 if text and args.stream:
                     print(text, end="", flush=True)
 
-        proc.wait()
-        stderr_output = proc.stderr.read()
+            profiler.complete("dispatch", dispatch_start, type=etype)
+
+        with profiler.phase("wait"):
+            proc.wait()
+            stderr_output = proc.stderr.read()
+        profiler.complete("child", child_start, tid=CHILD_TID, exit_code=proc.returncode)
 
         if args.stream:
             print()  # Final newline
@@ -138,8 +227,15 @@ def run(args: argparse.Namespace) -> int:
         if stderr_output.strip():
             result["stderr"] = stderr_output.strip()
 
+        if journal:
+            journal.finish(proc.returncode, stderr=result.get("stderr"))
+            result["run_id"] = journal.run_id
+
         if not args.stream:
-            print(json.dumps(result, ensure_ascii=False, indent=2))
+            with profiler.phase("serialize", messages=len(messages)):
+                output = json.dumps(result, ensure_ascii=False, indent=2)
+            with profiler.phase("write_output", chars=len(output)):
+                print(output)
 
         return proc.returncode
 
@@ -148,10 +244,18 @@ def run(args: argparse.Namespace) -> int:
             "error": "gemini command not found. Run: bash scripts/setup_check.sh",
             "exit_code": 127,
         }), file=sys.stderr)
+        if journal:
+            journal.finish(127, status="not_started")
         return 127
     except KeyboardInterrupt:
         print("\n[gemini_bridge] Interrupted.", file=sys.stderr)
+        if journal:
+            journal.finish(130, status="interrupted")
+            print(f"[gemini_bridge] Recover with: --recover {journal.run_id}", file=sys.stderr)
         return 130
+    finally:
+        if journal:
+            journal.close()
 
 
 def main():
@@ -160,8 +264,8 @@ def main():
     )
     parser.add_argument(
         "--prompt", "-p",
-        required=True,
-        help="Task prompt to send to Gemini",
+        default=None,
+        help="Task prompt to send to Gemini (required unless --recover is given)",
     )
     parser.add_argument(
         "--workdir", "-C",
@@ -198,9 +302,63 @@ def main():
         action="store_true",
         help="Print debug info to stderr",
     )
+    parser.add_argument(
+        "--recover",
+        metavar="RUN_ID",
+        default=None,
+        help="Rebuild the result of an interrupted run from its journal; "
+             "with --prompt, continue it via the captured session",
+    )
+    parser.add_argument(
+        "--no-journal",
+        action="store_true",
+        help="Do not write a run journal to ~/.ccg/runs/",
+    )
+    parser.add_argument(
+        "--context-map",
+        action="store_true",
+        help="Prepend a cached repository map (file tree, sizes, top-level symbols) "
+             "of --workdir to the prompt",
+    )
+    parser.add_argument(
+        "--profile",
+        nargs="?",
+        const="",
+        default=None,
+        metavar="TRACE_JSON",
+        help="Write a Chrome/Perfetto trace of bridge phases "
+             "(default: ~/.ccg/profiles/gemini-<timestamp>.trace.json)",
+    )
+    parser.add_argument(
+        "--profile-python",
+        action="store_true",
+        help="Also dump cProfile stats (.prof) for the bridge process; implies --profile",
+    )
+    parser.add_argument(
+        "--profile-memory",
+        action="store_true",
+        help="Also write top tracemalloc allocations (.alloc.txt); implies --profile",
+    )
 
     args = parser.parse_args()
-    sys.exit(run(args))
+    if not args.prompt and not args.recover:
+        parser.error("--prompt is required unless --recover is given")
+
+    profiler = BridgeProfiler(
+        "gemini",
+        enabled=args.profile is not None,
+        trace_path=args.profile or None,
+        cprofile=args.profile_python,
+        memory=args.profile_memory,
+    )
+    error = profiler.prepare()
+    if error:
+        # Fail before the agent runs rather than losing the profile afterwards
+        print(json.dumps({"error": f"Cannot write profile: {error}", "exit_code": 1}), file=sys.stderr)
+        sys.exit(1)
+    with profiler:
+        code = run(args, profiler)
+    sys.exit(code)
 
 
 if __name__ == "__main__":
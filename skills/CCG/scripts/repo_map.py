@@ -0,0 +1,334 @@
+#!/usr/bin/env python3
+"""
+Repository map for CCG bridges (--context-map).
+
+Builds a compact map of the working directory (file tree, sizes, top-level
+symbols per file) that the bridges prepend to the prompt, so the agent can go
+straight to the relevant files instead of rediscovering the layout with
+ls/grep/cat tool calls.
+
+The map is cached at ~/.ccg/repomap/<sha1 of workdir path>.json. In a git repo
+the cache records the workdir's tree hash in HEAD (`HEAD:./`, so a subdirectory
+gets its own tree) as a fast-path check, plus each file's blob ID; only files
+whose blob ID changed (or that are modified/untracked in the worktree) are
+re-parsed.
+Outside git, files are keyed by size and mtime. At most MAX_MAP_FILES files are
+listed and parsed, so pointing it at a huge directory (or $HOME) stays cheap.
+
+Usage:
+    python3 repo_map.py /path/to/project
+"""
+
+import ast
+import hashlib
+import json
+import os
+import re
+import subprocess
+import sys
+import tempfile
+from pathlib import Path
+
+CACHE_DIR = Path.home() / ".ccg" / "repomap"
+CACHE_VERSION = 1
+
+MAX_MAP_CHARS = 16000
+# Far more files than fit in MAX_MAP_CHARS; bounds the walk and parsing work
+MAX_MAP_FILES = 2000
+MAX_SYMBOLS_PER_FILE = 12
+MAX_PARSE_BYTES = 512 * 1024
+
+SKIP_DIRS = {
+    ".git", ".hg", ".svn", "node_modules", "__pycache__", ".venv", "venv",
+    ".tox", ".nox", ".mypy_cache", ".pytest_cache", ".ruff_cache",
+    "dist", "build", "target", ".next", ".idea", ".vscode",
+}
+
+_SYMBOL_PATTERNS = {
+    (".js", ".jsx", ".ts", ".tsx", ".mjs", ".cjs"):
+        r"^(?:export\s+)?(?:default\s+)?(?:async\s+)?"
+        r"(?:function\*?|class|interface|type|enum|const|let)\s+([A-Za-z_$][\w$]*)",
+    (".go",):
+        r"^(?:func(?:\s+\([^)]*\))?|type)\s+([A-Za-z_]\w*)",
+    (".rs",):
+        r"^(?:pub(?:\([^)]*\))?\s+)?(?:async\s+)?"
+        r"(?:fn|struct|enum|trait|mod|type|const|static)\s+([A-Za-z_]\w*)",
+    (".java", ".kt", ".cs", ".scala"):
+        r"^\s{0,4}(?:(?:public|private|protected|internal|abstract|final|static|sealed|data|open)\s+)*"
+        r"(?:class|interface|enum|record|object|fun)\s+([A-Za-z_]\w*)",
+    (".rb",):
+        r"^(?:class|module|def)\s+([A-Za-z_][\w:.?!]*)",
+    (".c", ".h", ".cc", ".cpp", ".hpp"):
+        r"^(?:typedef\s+)?(?:struct|class|enum|union)\s+([A-Za-z_]\w*)",
+    (".sh", ".bash"):
+        r"^(?:function\s+)?([A-Za-z_][\w-]*)\s*\(\)\s*\{",
+    (".md",):
+        r"^#{1,2}\s+(.+?)\s*$",
+}
+SYMBOL_PATTERNS = {
+    ext: re.compile(pattern, re.MULTILINE)
+    for exts, pattern in _SYMBOL_PATTERNS.items()
+    for ext in exts
+}
+
+_FENCED_BLOCK = re.compile(r"^```.*?^```", re.MULTILINE | re.DOTALL)
+
+
+def _git(root: Path, *args: str) -> str | None:
+    """Run a git command in root; return stdout, or None if git fails."""
+    try:
+        proc = subprocess.run(
+            ["git", "-C", str(root), *args],
+            capture_output=True,
+            text=True,
+        )
+    except FileNotFoundError:
+        return None
+    if proc.returncode != 0:
+        return None
+    return proc.stdout
+
+
+def _stat_key(path: Path) -> str | None:
+    try:
+        st = path.stat()
+    except OSError:
+        return None
+    return f"stat:{st.st_size}:{st.st_mtime_ns}"
+
+
+def _walk_files(root: Path, limit: int) -> dict[str, str]:
+    """Walk root outside git, stopping once more than `limit` files are found."""
+    keys = {}
+    for dirpath, dirnames, filenames in os.walk(root):
+        dirnames[:] = sorted(d for d in dirnames if d not in SKIP_DIRS and not d.startswith("."))
+        for name in sorted(filenames):
+            path = Path(dirpath) / name
+            key = _stat_key(path)
+            if key and path.is_file():
+                keys[path.relative_to(root).as_posix()] = key
+                if len(keys) > limit:
+                    return keys
+    return keys
+
+
+def list_files(root: Path) -> tuple[str | None, dict[str, str]]:
+    """Return (tree hash of root in HEAD, {relative path: change key}) for root.
+
+    Tracked files are keyed by their git blob ID; files modified in the
+    worktree or untracked (but not ignored) are keyed by size and mtime.
+    """
+    staged = _git(root, "ls-files", "-s", "-z")
+    if staged is None:
+        return None, _walk_files(root, MAX_MAP_FILES)
+
+    tree = (_git(root, "rev-parse", "HEAD:./") or "").strip() or None
+    keys = {}
+    for entry in staged.split("\0"):
+        if not entry:
+            continue
+        meta, path = entry.split("\t", 1)
+        mode, blob = meta.split()[:2]
+        if mode == "160000":  # submodule
+            continue
+        keys[path] = blob
+
+    dirty = (_git(root, "diff", "--name-only", "--relative", "-z") or "").split("\0")
+    untracked = (_git(root, "ls-files", "-o", "--exclude-standard", "-z") or "").split("\0")
+    for path in filter(None, dirty + untracked):
+        key = _stat_key(root / path)
+        if key:
+            keys[path] = key
+        else:
+            keys.pop(path, None)  # deleted in the worktree
+    return tree, keys
+
+
+def extract_symbols(path: Path) -> list[str]:
+    """Return the top-level symbols defined in a source file."""
+    try:
+        if path.stat().st_size > MAX_PARSE_BYTES:
+            return []
+        data = path.read_bytes()
+    except OSError:
+        return []
+    if b"\0" in data[:8192]:
+        return []
+    text = data.decode("utf-8", errors="replace")
+
+    if path.suffix == ".py":
+        try:
+            tree = ast.parse(text)
+        except (SyntaxError, ValueError):
+            return []
+        symbols = []
+        for node in tree.body:
+            if isinstance(node, ast.ClassDef):
+                symbols.append(f"class {node.name}")
+            elif isinstance(node, (ast.FunctionDef, ast.AsyncFunctionDef)):
+                symbols.append(f"def {node.name}")
+        return symbols[:MAX_SYMBOLS_PER_FILE]
+
+    pattern = SYMBOL_PATTERNS.get(path.suffix)
+    if not pattern:
+        return []
+    if path.suffix == ".md":
+        text = _FENCED_BLOCK.sub("", text)  # shell comments in code blocks are not headings
+    symbols = []
+    for match in pattern.finditer(text):
+        if match.group(1) not in symbols:
+            symbols.append(match.group(1))
+        if len(symbols) >= MAX_SYMBOLS_PER_FILE:
+            break
+    return symbols
+
+
+def _human_size(size: int) -> str:
+    for unit in ("B", "K", "M"):
+        if size < 1024 or unit == "M":
+            return f"{size}{unit}" if unit == "B" else f"{size:.1f}{unit}"
+        size /= 1024
+
+
+def render_map(
+    root: Path,
+    tree: str | None,
+    files: dict[str, dict],
+    max_chars: int = MAX_MAP_CHARS,
+    truncated: bool = False,
+) -> str:
+    """Render cached file entries as an indented tree, truncated to max_chars.
+
+    `truncated` marks that files beyond MAX_MAP_FILES were not listed at all.
+    """
+    header = f"Repository map of {root} ({len(files)}{'+' if truncated else ''} files"
+    header += f", git tree {tree[:12]})" if tree else ")"
+    lines = [header + ". Format: path size: top-level symbols"]
+    used = len(lines[0])
+    current_dir = None
+    paths = sorted(files)
+
+    for i, path in enumerate(paths):
+        entry = files[path]
+        parent, _, name = path.rpartition("/")
+        new_lines = []
+        if parent != current_dir:
+            current_dir = parent
+            if parent:
+                new_lines.append(f"{parent}/")
+        indent = "  " if parent else ""
+        line = f"{indent}{name} {_human_size(entry['size'])}"
+        if entry["symbols"]:
+            line += ": " + ", ".join(entry["symbols"])
+        new_lines.append(line)
+
+        cost = sum(len(l) + 1 for l in new_lines)
+        if used + cost > max_chars:
+            lines.append(f"... ({len(paths) - i}{'+' if truncated else ''} more files not shown)")
+            break
+        lines.extend(new_lines)
+        used += cost
+    else:
+        if truncated:
+            lines.append("... (more files not shown)")
+
+    return "\n".join(lines)
+
+
+def _cache_path(root: Path) -> Path:
+    digest = hashlib.sha1(str(root).encode("utf-8")).hexdigest()[:16]
+    return CACHE_DIR / f"{digest}.json"
+
+
+def _load_cache(path: Path) -> dict:
+    try:
+        with open(path) as f:
+            cache = json.load(f)
+    except (OSError, json.JSONDecodeError):
+        return {}
+    if cache.get("version") != CACHE_VERSION:
+        return {}
+    return cache
+
+
+def _save_cache(path: Path, cache: dict):
+    path.parent.mkdir(parents=True, exist_ok=True)
+    # Unique temp file: Codex and Gemini often map the same workdir concurrently
+    fd, tmp = tempfile.mkstemp(dir=path.parent, prefix=path.stem, suffix=".tmp")
+    try:
+        with os.fdopen(fd, "w") as f:
+            json.dump(cache, f, ensure_ascii=False)
+        os.replace(tmp, path)
+    except BaseException:
+        os.unlink(tmp)
+        raise
+
+
+def build_repo_map(workdir: str | None = None, max_chars: int = MAX_MAP_CHARS) -> tuple[str, dict]:
+    """Build (or refresh from cache) the repository map for workdir.
+
+    Returns (map text, stats) where stats counts reused and re-parsed files.
+    """
+    root = Path(workdir or os.getcwd()).resolve()
+    cache_file = _cache_path(root)
+    cache = _load_cache(cache_file)
+    cached_files = cache.get("files", {})
+
+    tree, keys = list_files(root)
+    truncated = len(keys) > MAX_MAP_FILES
+    if truncated:
+        keys = {path: keys[path] for path in sorted(keys)[:MAX_MAP_FILES]}
+    stats = {"files": len(keys), "truncated": truncated, "reused": 0, "parsed": 0, "tree": tree}
+
+    if cache.get("tree") == tree and cache.get("max_chars") == max_chars and cache.get("map") \
+            and cache.get("truncated") == truncated \
+            and {p: e["key"] for p, e in cached_files.items()} == keys:
+        stats["reused"] = len(keys)
+        return cache["map"], stats
+
+    files = {}
+    for path, key in keys.items():
+        entry = cached_files.get(path)
+        if entry and entry["key"] == key:
+            files[path] = entry
+            stats["reused"] += 1
+            continue
+        full = root / path
+        try:
+            size = full.stat().st_size
+        except OSError:
+            continue
+        files[path] = {"key": key, "size": size, "symbols": extract_symbols(full)}
+        stats["parsed"] += 1
+
+    text = render_map(root, tree, files, max_chars, truncated)
+    try:
+        _save_cache(cache_file, {
+            "version": CACHE_VERSION,
+            "root": str(root),
+            "tree": tree,
+            "max_chars": max_chars,
+            "truncated": truncated,
+            "files": files,
+            "map": text,
+        })
+    except OSError as e:
+        # The cache only saves work next time; the map itself is still good
+        stats["cache_error"] = str(e)
+    return text, stats
+
+
+def with_context_map(prompt: str, repo_map: str) -> str:
+    """Prepend a repository map to a task prompt."""
+    return (
+        "Below is a map of the repository you are working in. Use it to go "
+        "directly to the relevant files instead of exploring the layout.\n\n"
+        f"<repository_map>\n{repo_map}\n</repository_map>\n\n"
+        f"Task:\n{prompt}"
+    )
+
+
+if __name__ == "__main__":
+    text, stats = build_repo_map(sys.argv[1] if len(sys.argv) > 1 else None)
+    print(text)
+    print(json.dumps(stats), file=sys.stderr)
@@ -0,0 +1,203 @@
+#!/usr/bin/env python3
+"""
+Run journal for CCG bridges.
+
+Each bridge run appends its session ID and collected messages to
+~/.ccg/runs/<run_id>/journal.jsonl, so a run that is interrupted or killed
+can be rebuilt with `--recover <run_id>` instead of being re-run from zero.
+
+Records are flushed to the OS on every write (surviving a killed process)
+and fsync'd in batches (surviving a host crash without paying an fsync per
+event). Session IDs are fsync'd immediately since they are needed to continue.
+Journals hold prompts and command output, so they are private to the user
+(0700 directories, 0600 files). Journaling is best-effort: if a write fails,
+a warning is printed and the run continues without it.
+"""
+
+import json
+import os
+import shutil
+import sys
+import time
+import uuid
+from pathlib import Path
+
+RUNS_DIR = Path.home() / ".ccg" / "runs"
+JOURNAL_NAME = "journal.jsonl"
+
+# fsync after this many unsynced records or this many seconds, whichever first
+FSYNC_BATCH = 32
+FSYNC_INTERVAL = 1.0
+
+# Journals kept in RUNS_DIR; older ones are pruned when a new run starts
+MAX_RUNS = 50
+
+
+def new_run_id() -> str:
+    """Return a sortable, unique run ID (e.g. 20260101-120000-1a2b3c)."""
+    return time.strftime("%Y%m%d-%H%M%S") + "-" + uuid.uuid4().hex[:6]
+
+
+def prune_runs(keep: int = MAX_RUNS):
+    """Delete all but the `keep` most recent run journals."""
+    if not RUNS_DIR.exists():
+        return
+    runs = sorted(p for p in RUNS_DIR.iterdir() if p.is_dir())
+    for path in runs[:max(len(runs) - keep, 0)]:
+        shutil.rmtree(path, ignore_errors=True)
+
+
+class RunJournal:
+    """Append-only JSONL journal for a single bridge run."""
+
+    def __init__(self, agent: str, run_id: str | None = None):
+        self.agent = agent
+        self.run_id = run_id or new_run_id()
+        self.path = RUNS_DIR / self.run_id / JOURNAL_NAME
+        prune_runs(MAX_RUNS - 1)
+        RUNS_DIR.mkdir(mode=0o700, parents=True, exist_ok=True)
+        self.path.parent.mkdir(mode=0o700, exist_ok=True)
+        self.session_id = None
+        fd = os.open(self.path, os.O_WRONLY | os.O_CREAT | os.O_APPEND, 0o600)
+        self._file = os.fdopen(fd, "a", encoding="utf-8")
+        self._pending = 0
+        self._last_sync = time.monotonic()
+        self._failed = False
+
+    def _fail(self, error: OSError):
+        """Stop journaling after a write error instead of crashing the run."""
+        self._failed = True
+        print(f"[{self.agent}_bridge] Run journal disabled: {error}", file=sys.stderr)
+        try:
+            self._file.close()
+        except OSError:
+            pass
+
+    def append(self, kind: str, **fields):
+        """Append one record; fsync when the batch is full or stale."""
+        if self._failed:
+            return
+        record = {"kind": kind, "ts": time.time(), **fields}
+        try:
+            self._file.write(json.dumps(record, ensure_ascii=False) + "\n")
+            self._file.flush()
+        except OSError as e:
+            self._fail(e)
+            return
+        self._pending += 1
+        if self._pending >= FSYNC_BATCH or time.monotonic() - self._last_sync >= FSYNC_INTERVAL:
+            self.sync()
+
+    def start(self, args):
+        """Record the run parameters (the user's prompt, not any context map)."""
+        self.append(
+            "start",
+            agent=self.agent,
+            prompt=args.prompt,
+            workdir=os.path.abspath(args.workdir or os.getcwd()),
+            model=args.model,
+            recovered_from=getattr(args, "recover", None),
+        )
+        self.sync()
+
+    def record_session(self, session_id: str | None):
+        """Record the session ID the first time it is seen (or when it changes)."""
+        if session_id and session_id != self.session_id:
+            self.session_id = session_id
+            self.append("session", session_id=session_id)
+            self.sync()
+
+    def record_message(self, message: dict):
+        self.append("message", message=message)
+
+    def finish(self, exit_code: int, status: str = "exited", stderr: str | None = None):
+        """Record how the run ended and sync everything to disk.
+
+        `status` is "exited" when the child ran to completion, otherwise
+        "interrupted" or "not_started"; only "exited" runs count as finished.
+        """
+        self.append("end", status=status, exit_code=exit_code, stderr=stderr)
+        self.sync()
+
+    def sync(self):
+        if self._failed:
+            return
+        if self._pending:
+            try:
+                os.fsync(self._file.fileno())
+            except OSError as e:
+                self._fail(e)
+                return
+            self._pending = 0
+        self._last_sync = time.monotonic()
+
+    def close(self):
+        if self._failed or self._file.closed:
+            return
+        self.sync()
+        try:
+            self._file.close()
+        except OSError:
+            pass
+
+
+def load_journal(run_id: str, agent: str) -> dict:
+    """Rebuild a bridge result from a run journal.
+
+    The result has the usual bridge fields plus `start`, the run's start
+    record (prompt, workdir, model), so a continuation can reuse them.
+    `finished` is true only if the child ran to completion; `status` is
+    "exited", "interrupted", "not_started", or "incomplete" (no end record,
+    e.g. the bridge was killed).
+
+    Tolerates a truncated final line (the process may have died mid-write).
+    Raises FileNotFoundError if the run does not exist and ValueError if it
+    was recorded by a different agent.
+    """
+    path = RUNS_DIR / run_id / JOURNAL_NAME
+    if not path.exists():
+        raise FileNotFoundError(f"No journal found for run {run_id} at {path}")
+
+    start = {}
+    session_id = None
+    status = None
+    exit_code = None
+    stderr = None
+    messages = []
+
+    with open(path, encoding="utf-8") as f:
+        for line in f:
+            try:
+                record = json.loads(line)
+            except json.JSONDecodeError:
+                continue
+            kind = record.get("kind")
+            if kind == "start":
+                start = record
+            elif kind == "session":
+                session_id = record["session_id"]
+            elif kind == "message":
+                messages.append(record["message"])
+            elif kind == "end":
+                status = record.get("status")
+                exit_code = record.get("exit_code")
+                stderr = record.get("stderr")
+
+    run_agent = start.get("agent")
+    if run_agent and run_agent != agent:
+        raise ValueError(f"Run {run_id} was recorded by {run_agent}, not {agent}")
+
+    result = {
+        "run_id": run_id,
+        "recovered": True,
+        "finished": status == "exited",
+        "status": status or "incomplete",
+        "exit_code": exit_code,
+        "session_id": session_id,
+        "message_count": len(messages),
+        "messages": messages,
+        "start": start,
+    }
+    if stderr:
+        result["stderr"] = stderr
+    return result